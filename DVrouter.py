@@ -1,9 +1,16 @@
 from router import Router
 from packet import Packet
+from routing_codec import encode, parse
 import json
 
+_ROUTING = Packet.ROUTING
+
 
 class DVrouter(Router):
+    __slots__ = ("heartbeat_time", "last_time", "neighbors", "dv",
+                 "dv_from_neighbors", "forwarding_table", "_addr_to_port",
+                 "_dv_content", "_outgoing_dv", "_dirty")
+
     def __init__(self, addr, heartbeat_time):
         super().__init__(addr)
         self.heartbeat_time = heartbeat_time
@@ -12,25 +19,36 @@ class DVrouter(Router):
         self.dv = {addr: 0}
         self.dv_from_neighbors = {}
         self.forwarding_table = {}
+        self._addr_to_port = {}
+        self._dv_content = {}
+        self._outgoing_dv = {}
+        self._dirty = False
 
     def handle_new_link(self, port, endpoint, cost):
         self.neighbors[port] = (endpoint, cost)
+        self._addr_to_port[endpoint] = port
         self.dv_from_neighbors[endpoint] = {}
+        self._dv_content.pop(endpoint, None)
         if endpoint not in self.dv or cost < self.dv[endpoint]:
             self.dv[endpoint] = cost
             self.forwarding_table[endpoint] = port
-        self.send_dv_to_neighbors()
+        self._dirty = True
 
     def handle_remove_link(self, port):
         if port not in self.neighbors:
             return
         neighbor_addr, _ = self.neighbors.pop(port)
+        self._addr_to_port.pop(neighbor_addr, None)
         self.dv_from_neighbors.pop(neighbor_addr, None)
+        self._dv_content.pop(neighbor_addr, None)
         self.update_forwarding_table()
-        self.send_dv_to_neighbors()
+        self._dirty = True
 
     def handle_time(self, time_ms):
-        if time_ms - self.last_time >= self.heartbeat_time:
+        if self._dirty or time_ms - self.last_time >= self.heartbeat_time:
+            if self._dirty:
+                self._outgoing_dv.clear()
+            self._dirty = False
             self.last_time = time_ms
             self.send_dv_to_neighbors()
 
@@ -43,22 +61,73 @@ class DVrouter(Router):
         else:
             neighbor = packet.src_addr
             content_str = packet.content
+            if self._dv_content.get(neighbor) == content_str:
+                return
             try:
-                their_dv = json.loads(content_str)
+                their_dv = parse(content_str)
             except (TypeError, json.JSONDecodeError):
                 return
-            if neighbor not in self.dv_from_neighbors or self.dv_from_neighbors[neighbor] != their_dv:
-                self.dv_from_neighbors[neighbor] = their_dv
-                self.update_forwarding_table()
-                self.send_dv_to_neighbors()
+            self._dv_content[neighbor] = content_str
+            old_dv = self.dv_from_neighbors.get(neighbor)
+            if old_dv is not None and old_dv == their_dv:
+                return
+            self.dv_from_neighbors[neighbor] = their_dv
+            if self.relax_neighbor_dv(neighbor, old_dv or {}, their_dv):
+                self._dirty = True
 
     def send_dv_to_neighbors(self):
-        content_str = json.dumps(self.dv)
         for port, (nbr_addr, _) in self.neighbors.items():
-            pkt = Packet(Packet.ROUTING, self.addr,
+            content_str = self._outgoing_dv.get(port)
+            if content_str is None:
+                content_str = encode({
+                    dest: cost for dest, cost in self.dv.items()
+                    if dest == nbr_addr or self.forwarding_table.get(dest) != port})
+                self._outgoing_dv[port] = content_str
+            pkt = Packet(_ROUTING, self.addr,
                          nbr_addr, content=content_str)
             self.send(port, pkt)
 
+    def relax_neighbor_dv(self, neighbor, old_dv, their_dv):
+        out_port = self._addr_to_port.get(neighbor)
+        if out_port is None:
+            return False
+        cost_to_nbr = self.neighbors[out_port][1]
+        changed = False
+        for dest in old_dv.keys() | their_dv.keys():
+            if dest == self.addr or old_dv.get(dest) == their_dv.get(dest):
+                continue
+            dcost = their_dv.get(dest)
+            current = self.dv.get(dest)
+            if dcost is not None and (current is None or cost_to_nbr + dcost < current):
+                self.dv[dest] = cost_to_nbr + dcost
+                self.forwarding_table[dest] = out_port
+                changed = True
+            elif self.forwarding_table.get(dest) == out_port:
+                changed |= self.recompute_route(dest)
+        return changed
+
+    def recompute_route(self, dest):
+        best, best_port = None, None
+        for port, (nbr, cost) in self.neighbors.items():
+            if nbr == dest and (best is None or cost < best):
+                best, best_port = cost, port
+        for nbr, their_dv in self.dv_from_neighbors.items():
+            out_port = self._addr_to_port.get(nbr)
+            if out_port is None or dest not in their_dv:
+                continue
+            total = self.neighbors[out_port][1] + their_dv[dest]
+            if best is None or total < best:
+                best, best_port = total, out_port
+        if best is None:
+            changed = dest in self.dv
+            self.dv.pop(dest, None)
+            self.forwarding_table.pop(dest, None)
+            return changed
+        changed = self.dv.get(dest) != best or self.forwarding_table.get(dest) != best_port
+        self.dv[dest] = best
+        self.forwarding_table[dest] = best_port
+        return changed
+
     def update_forwarding_table(self):
         new_dv = {self.addr: 0}
         new_ft = {}
@@ -68,8 +137,7 @@ class DVrouter(Router):
                 new_ft[nbr] = port
 
         for nbr, their_dv in self.dv_from_neighbors.items():
-            out_port = next(
-                (p for p, (addr, _) in self.neighbors.items() if addr == nbr), None)
+            out_port = self._addr_to_port.get(nbr)
             if out_port is None:
                 continue
             cost_to_nbr = self.neighbors[out_port][1]
@@ -1,9 +1,17 @@
 from router import Router
 from packet import Packet
-import heapq
+from routing_codec import encode, parse
+from shortest_paths import dijkstra
 import json
 
+_ROUTING = Packet.ROUTING
+
+
 class LSrouter(Router):
+    __slots__ = ("heartbeat_time", "last_time", "lsdb", "neighbors",
+                 "forwarding_table", "seq_num", "_addr_to_port",
+                 "_cached_lsp_links", "_cached_lsp_content", "_lsp_dirty",
+                 "_lsdb_dirty", "_nodes", "_id_of", "_adj")
 
     def __init__(self, addr, heartbeat_time):
         super().__init__(addr)
@@ -14,22 +22,31 @@ class LSrouter(Router):
         self.neighbors = {}
         self.forwarding_table = {}
         self.seq_num = 0
+        self._addr_to_port = {}
+        self._cached_lsp_links = None
+        self._cached_lsp_content = None
+        self._lsp_dirty = True
+        self._lsdb_dirty = True
+        self._nodes = []
+        self._id_of = {}
+        self._adj = []
 
     def handle_new_link(self, port, endpoint, cost):
         self.neighbors[port] = (endpoint, cost)
-        self.seq_num += 1
-        self.advertise_lsp()
+        self._addr_to_port[endpoint] = port
+        self._lsp_dirty = True
+        self.send_lsdb(port, endpoint)
 
     def handle_remove_link(self, port):
         if port in self.neighbors:
-            del self.neighbors[port]
-            self.seq_num += 1
-            self.advertise_lsp()
+            nbr, _ = self.neighbors.pop(port)
+            self._addr_to_port.pop(nbr, None)
+            self._lsp_dirty = True
 
     def handle_time(self, time_ms):
-        if time_ms - self.last_time >= self.heartbeat_time:
+        changed = self._lsp_dirty and self.update_lsp()
+        if changed or time_ms - self.last_time >= self.heartbeat_time:
             self.last_time = time_ms
-            self.seq_num += 1
             self.advertise_lsp()
 
     def handle_packet(self, port, packet):
@@ -40,61 +57,94 @@ class LSrouter(Router):
                 self.send(out_port, packet)
         else:
             try:
-                origin, seq, links = json.loads(packet.content)
+                origin, seq, links = parse(packet.content)
             except (TypeError, json.JSONDecodeError, ValueError):
                 return
+            if origin == self.addr:
+                return
             prev = self.lsdb.get(origin)
-            if prev is None or seq > prev[0]:
-                self.lsdb[origin] = (seq, links.copy())
-                self.run_dijkstra()
-                for p, (nbr, _) in self.neighbors.items():
-                    if p != port:
-                        content_str = json.dumps((origin, seq, links))
-                        pkt = Packet(Packet.ROUTING, self.addr, nbr, content=content_str)
-                        self.send(p, pkt)
+            if prev is not None and seq <= prev[0]:
+                return
+            if prev is not None and prev[1] == links:
+                self.lsdb[origin] = (seq, prev[1])
+                return
+            self.lsdb[origin] = (seq, links)
+            self._lsdb_dirty = True
+            self.run_dijkstra()
+            content_str = packet.content
+            for p, (nbr, _) in self.neighbors.items():
+                if p != port:
+                    pkt = Packet(_ROUTING, self.addr, nbr, content=content_str)
+                    self.send(p, pkt)
 
-    def advertise_lsp(self):
+    def send_lsdb(self, port, nbr):
+        for origin, (seq, links) in self.lsdb.items():
+            content_str = encode((origin, seq, links))
+            pkt = Packet(_ROUTING, self.addr, nbr, content=content_str)
+            self.send(port, pkt)
+
+    def update_lsp(self):
+        self._lsp_dirty = False
         links = {nbr: cost for (_, (nbr, cost)) in self.neighbors.items()}
-        self.lsdb[self.addr] = (self.seq_num, links.copy())
-        content_str = json.dumps((self.addr, self.seq_num, links))
+        changed = links != self._cached_lsp_links
+        if changed:
+            self._cached_lsp_links = links
+            self.seq_num += 1
+            self.lsdb[self.addr] = (self.seq_num, links)
+            self._lsdb_dirty = True
+            self._cached_lsp_content = encode((self.addr, self.seq_num, links))
+        self.run_dijkstra()
+        return changed
+
+    def advertise_lsp(self):
+        content_str = self._cached_lsp_content
+        if content_str is None:
+            return
         for port, (nbr, _) in self.neighbors.items():
-            pkt = Packet(Packet.ROUTING, self.addr, nbr, content=content_str)
+            pkt = Packet(_ROUTING, self.addr, nbr, content=content_str)
             self.send(port, pkt)
-        self.run_dijkstra()
+
+    def rebuild_graph(self):
+        nodes = list(self.lsdb)
+        if self.addr not in self.lsdb:
+            nodes.append(self.addr)
+        id_of = {r: i for i, r in enumerate(nodes)}
+        adj = [[] for _ in nodes]
+        for router, (_, links) in self.lsdb.items():
+            edges = adj[id_of[router]]
+            for v, w in links.items():
+                if v not in id_of:
+                    id_of[v] = len(nodes)
+                    nodes.append(v)
+                    adj.append([])
+                edges.append((w, id_of[v]))
+        self._nodes = nodes
+        self._id_of = id_of
+        self._adj = adj
+        self._lsdb_dirty = False
 
     def run_dijkstra(self):
-        graph = {router: links.copy() for router, (_, links) in self.lsdb.items()}
-        dist = {self.addr: 0}
-        prev = {}
-        heap = [(0, self.addr)]
-        visited = set()
-        while heap:
-            d, u = heapq.heappop(heap)
-            if u in visited:
-                continue
-            visited.add(u)
-            for v, w in graph.get(u, {}).items():
-                nd = d + w
-                if v not in dist or nd < dist[v]:
-                    dist[v] = nd
-                    prev[v] = u
-                    heapq.heappush(heap, (nd, v))
-       
-        self.forwarding_table.clear()
-        for dest, total_cost in dist.items():
-            if dest == self.addr:
-                continue
-            next_hop = dest
-            while prev.get(next_hop) != self.addr:
-                next_hop = prev.get(next_hop)
-                if next_hop is None:
-                    break
-            if next_hop is None:
+        if self._lsdb_dirty:
+            self.rebuild_graph()
+        nodes = self._nodes
+        n = len(nodes)
+        src = self._id_of[self.addr]
+        dist, first_hop = dijkstra(n, self._adj, src)
+
+        new_ft = {}
+        for v in range(n):
+            if v == src or first_hop[v] < 0:
                 continue
-            for port, (nbr, _) in self.neighbors.items():
-                if nbr == next_hop:
-                    self.forwarding_table[dest] = (port, total_cost)
-                    break
+            port = self._addr_to_port.get(nodes[first_hop[v]])
+            if port is not None:
+                new_ft[nodes[v]] = (port, dist[v])
+
+        ft = self.forwarding_table
+        for dest in [dest for dest in ft if dest not in new_ft]:
+            del ft[dest]
+        for dest, entry in new_ft.items():
+            if ft.get(dest) != entry:
+                ft[dest] = entry
 
     def __repr__(self):
         return f"LSrouter(addr={self.addr}, ft={self.forwarding_table})"
\ No newline at end of file
@@ -23,6 +23,8 @@ class Router:
         Routing information should be sent at least once every heartbeat_time ms.
     """
 
+    __slots__ = ("addr", "links", "link_changes", "keep_running")
+
     def __init__(self, addr, heartbeat_time=None):
         self.addr = addr
         self.links = {}  # Links indexed by port
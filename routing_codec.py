@@ -0,0 +1,34 @@
+from collections import OrderedDict
+import json
+
+PARSE_CACHE_SIZE = 256
+
+encode = json.JSONEncoder(separators=(",", ":")).encode
+decode = json.JSONDecoder().decode
+
+_parse_cache = OrderedDict()
+
+
+def parse(content_str):
+    """Decode routing packet content, reusing the result for repeated content.
+
+    Decoded values are cached by content string and shared by every router in the
+    process, so a flooded LSP or repeated DV is decoded only once. The oldest entry is
+    evicted once the cache holds more than PARSE_CACHE_SIZE entries.
+
+    The returned value is shared, unlike the per-router copy `Link.send` makes of the
+    content string. Callers must treat it as immutable: an in-place edit would
+    silently change the state of every router holding the same value.
+
+    Parameters
+    ----------
+    content_str
+        The content of a routing packet.
+    """
+    parsed = _parse_cache.get(content_str)
+    if parsed is None:
+        parsed = decode(content_str)
+        _parse_cache[content_str] = parsed
+        if len(_parse_cache) > PARSE_CACHE_SIZE:
+            _parse_cache.popitem(last=False)
+    return parsed
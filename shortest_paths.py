@@ -0,0 +1,41 @@
+import heapq
+
+INF = float("inf")
+
+
+def dijkstra(n, adj, src):
+    """Single-source shortest paths over a graph with dense integer vertex ids.
+
+    Parameters
+    ----------
+    n
+        The number of vertices, numbered 0 to n - 1.
+    adj
+        Adjacency lists indexed by vertex id, each a list of (cost, neighbor id).
+    src
+        The id of the source vertex.
+
+    Returns
+    -------
+    A (dist, first_hop) pair of lists indexed by vertex id. dist holds the path cost
+    (INF if unreachable) and first_hop the id of the first vertex after src on the
+    shortest path (-1 for src and unreachable vertices).
+    """
+    heappop = heapq.heappop
+    heappush = heapq.heappush
+    dist = [INF] * n
+    dist[src] = 0
+    first_hop = [-1] * n
+    heap = [(0, src)]
+    while heap:
+        d, u = heappop(heap)
+        if d > dist[u]:
+            continue
+        hop = first_hop[u]
+        for w, v in adj[u]:
+            nd = d + w
+            if nd < dist[v]:
+                dist[v] = nd
+                first_hop[v] = v if u == src else hop
+                heappush(heap, (nd, v))
+    return dist, first_hop